@@ -0,0 +1,284 @@
+"""
+CrowdCode: GitHub API Record/Replay Cassettes
+
+Shared by the CrowdCode scripts to capture every GitHub API request and
+response of a run into a gzip-compressed cassette (--record-cassette), and to
+serve a captured run back offline (--replay-cassette). Replays make no network
+calls and are not subject to rate limits, so a production workload can be
+re-run and profiled deterministically.
+
+Cassettes are JSON Lines: a header line holding the run's trigger context
+(event name and payload, DRY_RUN), followed by one line per interaction
+holding the method, URL, request body, status, response headers (including
+rate-limit headers), response body and the time the request took. Request
+headers are never recorded, so the token does not end up in the cassette.
+"""
+
+import os
+import gzip
+import json
+import time
+import functools
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+
+CASSETTE_VERSION = 1
+
+class CassetteError(Exception):
+    """Raised when a replayed run makes a request the cassette does not hold"""
+
+class CassetteResponse:
+    """Minimal response object in the shape PyGithub's Requester reads"""
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def getheaders(self):
+        return self.headers
+
+    def read(self):
+        return self.body
+
+class RecordingConnection:
+    """Wraps a real PyGithub connection and records each exchange"""
+
+    def __init__(self, cassette, real_class, host, port=None, *args, **kwargs):
+        self.cassette = cassette
+        self.host = host
+        self.connection = real_class(host, port, *args, **kwargs)
+        self.pending = None
+
+    def request(self, verb, url, input, headers):
+        self.pending = (verb, url, input if isinstance(input, str) else None, time.perf_counter())
+        self.connection.request(verb, url, input, headers)
+
+    def getresponse(self):
+        response = self.connection.getresponse()
+        verb, url, body, started = self.pending
+        status = response.status
+        headers = [[key, value] for key, value in response.getheaders()]
+        output = response.read()
+        self.cassette.record({
+            'method': verb,
+            'host': self.host,
+            'url': url,
+            'request_body': body,
+            'status': status,
+            'headers': headers,
+            'body': output.decode('utf-8') if isinstance(output, bytes) else output,
+            'elapsed': time.perf_counter() - started
+        })
+        return CassetteResponse(status, headers, output)
+
+    def close(self):
+        self.connection.close()
+
+class ReplayingConnection:
+    """Serves recorded exchanges instead of talking to GitHub"""
+
+    def __init__(self, cassette, host, port=None, *args, **kwargs):
+        self.cassette = cassette
+        self.host = host
+        self.key = None
+        self.body = None
+
+    def request(self, verb, url, input, headers):
+        self.key = (verb, self.host, url)
+        self.body = input if isinstance(input, str) else None
+
+    def getresponse(self):
+        interaction = self.cassette.replay(self.key, self.body)
+        return CassetteResponse(interaction['status'], interaction['headers'], interaction['body'])
+
+    def close(self):
+        pass
+
+class Cassette:
+    """Records or replays the GitHub API traffic of a single script run"""
+
+    def __init__(self):
+        self.mode = None
+        self.path = None
+        self.file = None
+        self.latency = 0.0
+        self.latency_scale = 0.0
+        self.interactions = {}
+        self.last_served = {}
+        self.count = 0
+        self.repeated = 0
+        self.rate_limit_remaining = None
+        self.event_path = None
+        self.lock = threading.Lock()
+
+    def start_recording(self, path):
+        """Route PyGithub through recording connections writing to path"""
+        import github.Requester as requester
+
+        self.mode = 'record'
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self.file.write(json.dumps({
+            'cassette': CASSETTE_VERSION,
+            'recorded': datetime.utcnow().isoformat(),
+            'repository': os.environ.get('GITHUB_REPOSITORY'),
+            'event_name': os.environ.get('GITHUB_EVENT_NAME'),
+            'event': load_event_payload(),
+            'dry_run': os.environ.get('DRY_RUN')
+        }) + '\n')
+        # partial objects, unlike functions, are not bound to the Requester instance
+        requester.Requester.injectConnectionClasses(
+            functools.partial(RecordingConnection, self, requester.HTTPRequestsConnectionClass),
+            functools.partial(RecordingConnection, self, requester.HTTPSRequestsConnectionClass)
+        )
+        # injectConnectionClasses also turns off connection reuse, which would
+        # add a fresh TCP/TLS handshake to every recorded timing. Production
+        # runs reuse one connection, so recordings must too; finish() resets it.
+        requester.Requester._Requester__persist = True
+
+    def start_replaying(self, path, latency=0.0, latency_scale=0.0):
+        """Route PyGithub through connections that serve the cassette at path
+
+        Each response is delayed by latency seconds plus latency_scale times
+        the duration recorded for it.
+        """
+        import github.Requester as requester
+
+        self.mode = 'replay'
+        self.path = path
+        self.latency = latency
+        self.latency_scale = latency_scale
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('cassette') != CASSETTE_VERSION:
+                raise CassetteError(f"Unsupported cassette version in {path}: {header.get('cassette')}")
+            for line in f:
+                interaction = json.loads(line)
+                key = (interaction['method'], interaction['host'], interaction['url'])
+                self.interactions.setdefault(key, deque()).append(interaction)
+        # Replays never reach GitHub, so any token will do
+        os.environ.setdefault('GITHUB_TOKEN', 'cassette-replay')
+        os.environ.setdefault('GITHUB_REPOSITORY', header.get('repository') or '')
+        self.restore_trigger(header)
+        requester.Requester.injectConnectionClasses(
+            functools.partial(ReplayingConnection, self),
+            functools.partial(ReplayingConnection, self)
+        )
+
+    def restore_trigger(self, header):
+        """Re-create the recorded run's trigger context so it takes the same path"""
+        for name in ('GITHUB_EVENT_NAME', 'GITHUB_EVENT_PATH'):
+            os.environ.pop(name, None)
+        if header.get('dry_run') is not None:
+            os.environ['DRY_RUN'] = header['dry_run']
+        if header.get('event_name'):
+            os.environ['GITHUB_EVENT_NAME'] = header['event_name']
+        if header.get('event') is not None:
+            with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+                json.dump(header['event'], f)
+            self.event_path = f.name
+            os.environ['GITHUB_EVENT_PATH'] = self.event_path
+
+    def record(self, interaction):
+        with self.lock:
+            self.file.write(json.dumps(interaction) + '\n')
+            self.count += 1
+            for key, value in interaction['headers']:
+                if key.lower() == 'x-ratelimit-remaining':
+                    self.rate_limit_remaining = value
+
+    def replay(self, key, body=None):
+        """Serve the next recorded response for (method, host, url)
+
+        Responses are served in recorded order. Request bodies are only a
+        tie-breaker, since writes such as the vote summary embed volatile
+        fields like timestamps and never match the recording exactly.
+        """
+        with self.lock:
+            queue = self.interactions.get(key)
+            if queue:
+                interaction = next((i for i in queue if body is not None and i['request_body'] == body), queue[0])
+                queue.remove(interaction)
+                self.last_served[key] = interaction
+            elif key in self.last_served:
+                # The run repeated a request more often than when recorded
+                interaction = self.last_served[key]
+                self.repeated += 1
+            else:
+                raise CassetteError(f"No recorded response for {key[0]} {key[2]}")
+            self.count += 1
+        delay = self.latency + self.latency_scale * interaction.get('elapsed', 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return interaction
+
+    def finish(self):
+        """Restore normal connections and report what was recorded or replayed"""
+        if not self.mode:
+            return
+        import github.Requester as requester
+
+        requester.Requester.resetConnectionClasses()
+        if self.event_path:
+            os.remove(self.event_path)
+            self.event_path = None
+        if self.mode == 'record':
+            self.file.close()
+            print(f"\n✓ Recorded {self.count} API interaction(s) to {self.path}")
+            if self.rate_limit_remaining is not None:
+                print(f"  Rate limit remaining: {self.rate_limit_remaining}")
+        else:
+            unused = sum(len(queue) for queue in self.interactions.values())
+            print(f"\n✓ Replayed {self.count} API interaction(s) from {self.path}")
+            print(f"  Repeated: {self.repeated}, unused: {unused}")
+        self.mode = None
+
+cassette = Cassette()
+
+def load_event_payload():
+    """Return the triggering event's payload, or None outside event runs"""
+    event_path = os.environ.get('GITHUB_EVENT_PATH')
+    if not event_path:
+        return None
+    try:
+        with open(event_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read event payload {event_path}: {e}")
+        return None
+
+def github_client(token):
+    """Create the Github client, without client-side throttling when replaying
+
+    PyGithub spaces requests and writes apart by default; during a replay that
+    delay would dominate the timings the replay is meant to measure.
+    """
+    from github import Github
+
+    if cassette.mode == 'replay':
+        return Github(token, seconds_between_requests=None, seconds_between_writes=None)
+    return Github(token)
+
+def add_cassette_arguments(parser):
+    """Add the shared cassette options to a script's argument parser"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record-cassette', metavar='PATH',
+                       help='Record all GitHub API traffic to a gzip cassette')
+    group.add_argument('--replay-cassette', metavar='PATH',
+                       help='Serve GitHub API responses from a cassette instead of the network')
+    parser.add_argument('--replay-latency', type=float, default=0.0, metavar='SECONDS',
+                        help='Fixed delay added to each replayed response (default: 0)')
+    parser.add_argument('--replay-latency-scale', type=float, default=0.0, metavar='FACTOR',
+                        help='Delay each replayed response by FACTOR times its recorded duration (default: 0)')
+
+def start_cassette(args):
+    """Start recording or replaying if a cassette option was given"""
+    if args.record_cassette:
+        cassette.start_recording(args.record_cassette)
+    elif args.replay_cassette:
+        cassette.start_replaying(args.replay_cassette, args.replay_latency, args.replay_latency_scale)
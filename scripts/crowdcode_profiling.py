@@ -0,0 +1,174 @@
+"""
+CrowdCode: Profiling Helpers
+
+Shared by the CrowdCode scripts to time their main phases when run with
+--profile. Optionally captures a cProfile/pstats dump and tracemalloc memory
+statistics. All artifacts are written to --profile-dir so workflows can upload
+them.
+
+Profiling is a no-op unless enabled, so the hooks can stay in hot code paths.
+"""
+
+import os
+import json
+import time
+import cProfile
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+class Profiler:
+    """Collects named phase timings for a single script run"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output_dir = 'profile'
+        self.memory = False
+        self.cprofile = None
+        self.timings = {}
+        self.started = None
+
+    def start(self, output_dir='profile', cprofile=False, memory=False):
+        """Enable profiling for the rest of the run"""
+        self.enabled = True
+        self.output_dir = output_dir
+        self.memory = memory
+        self.started = time.perf_counter()
+        if memory:
+            tracemalloc.start()
+        if cprofile:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def _record(self, name, elapsed, memory_delta=None):
+        timing = self.timings.setdefault(name, {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        timing['calls'] += 1
+        timing['total_seconds'] += elapsed
+        timing['max_seconds'] = max(timing['max_seconds'], elapsed)
+        if memory_delta is not None:
+            timing['memory_delta_bytes'] = timing.get('memory_delta_bytes', 0) + memory_delta
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named block of code"""
+        if not self.enabled:
+            yield
+            return
+        memory_before = tracemalloc.get_traced_memory()[0] if self.memory else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            memory_delta = tracemalloc.get_traced_memory()[0] - memory_before if self.memory else None
+            self._record(name, elapsed, memory_delta)
+
+    def instrument(self, name):
+        """Decorator timing every call of a hot function under the given name"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.phase(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def iterate(self, name, iterable):
+        """Yield from iterable, timing only the fetches (e.g. API pagination)
+
+        A whole listing counts as one call, with the number of items yielded
+        recorded under 'items'. max_seconds is the slowest single fetch,
+        which for a paginated list is roughly one page request.
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        total = 0.0
+        slowest = 0.0
+        items = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = time.perf_counter() - start
+                    total += elapsed
+                    slowest = max(slowest, elapsed)
+                items += 1
+                yield item
+        finally:
+            # Also runs when the caller stops early (e.g. break)
+            self._record(name, total)
+            timing = self.timings[name]
+            timing['items'] = timing.get('items', 0) + items
+            timing['max_seconds'] = max(timing['max_seconds'], slowest)
+
+    def finish(self, script_name):
+        """Stop profiling and write the report and any dumps"""
+        if not self.enabled:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        report = {
+            'script': script_name,
+            'generated': datetime.utcnow().isoformat(),
+            'total_seconds': time.perf_counter() - self.started,
+            'phases': self.timings
+        }
+
+        if self.cprofile:
+            self.cprofile.disable()
+            pstats_path = os.path.join(self.output_dir, f"{script_name}.pstats")
+            self.cprofile.dump_stats(pstats_path)
+            report['pstats'] = pstats_path
+
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report['memory'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top_allocations': [
+                    {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:25]
+                ]
+            }
+
+        report_path = os.path.join(self.output_dir, f"{script_name}.json")
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        print(f"\nProfile ({report['total_seconds']:.2f}s total):")
+        for name, timing in sorted(self.timings.items(), key=lambda item: -item[1]['total_seconds']):
+            items = f", {timing['items']} item(s)" if 'items' in timing else ""
+            print(f"  {name}: {timing['total_seconds']:.3f}s over {timing['calls']} call(s){items}")
+        if self.memory:
+            print(f"  Peak memory: {report['memory']['peak_bytes'] / 1024:.1f} KiB")
+        print(f"✓ Wrote profile to {report_path}")
+        self.enabled = False
+
+profiler = Profiler()
+
+def add_profile_arguments(parser):
+    """Add the shared --profile options to a script's argument parser"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Time the main phases and write a profile report')
+    parser.add_argument('--profile-dir', default='profile',
+                        help='Directory for profile artifacts (default: profile)')
+    parser.add_argument('--profile-cprofile', action='store_true',
+                        help='Also write a cProfile/pstats dump (implies --profile)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Also record tracemalloc memory statistics (implies --profile; '
+                             'adds allocation overhead, so take timings from a separate run)')
+
+def start_profiling(args):
+    """Start the shared profiler if any --profile option was given"""
+    if args.profile or args.profile_cprofile or args.profile_memory:
+        profiler.start(args.profile_dir, cprofile=args.profile_cprofile, memory=args.profile_memory)
@@ -6,10 +6,169 @@ This script generates a dashboard showing all CrowdCode features across branches
 """
 
 import os
+import re
 import sys
 import json
-from github import Github
+import shutil
+import argparse
 from datetime import datetime
+from crowdcode_profiling import profiler, add_profile_arguments, start_profiling
+from crowdcode_cassette import cassette, add_cassette_arguments, start_cassette, github_client
+
+SHARD_DIR = 'shards'
+UNDATED_MONTH = 'undated'
+
+BRANCH_PREFIX_PATTERN = re.compile(r'^crowdcode/feature-\d*-?')
+
+def tokenize(text):
+    """Split a title or branch name into lowercase search tokens"""
+    return [token for token in re.split(r'[^a-z0-9]+', (text or '').lower()) if len(token) > 1]
+
+def branch_tokens(branch):
+    """Search tokens for a branch's slug
+
+    The shared crowdcode/feature-<n>- prefix would put every feature under
+    the same tokens and add a single-use number token for each one.
+    """
+    return tokenize(BRANCH_PREFIX_PATTERN.sub('', branch or ''))
+
+class ShardWriter:
+    """Stream features into per-status and per-month JSON shards
+
+    Each shard is a JSON array written one feature at a time, so the dashboard
+    page can lazy-load only the shards it needs. An inverted search index over
+    titles and branches is built alongside and written on close().
+
+    Shards are written to a staging directory and only swapped in by close(),
+    so a failed run leaves the previous shards and manifest intact.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.shard_dir = os.path.join(output_dir, f".{SHARD_DIR}.tmp")
+        self.files = {}
+        self.counts = {}
+        self.index = {}
+        self.docs = []
+        # Leftovers of an earlier failed run
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+        os.makedirs(self.shard_dir)
+
+    def _append(self, shard, feature):
+        f = self.files.get(shard)
+        if f is None:
+            f = open(os.path.join(self.shard_dir, f"{shard}.json"), 'w')
+            f.write('[')
+            self.files[shard] = f
+            self.counts[shard] = 0
+        else:
+            f.write(',')
+        f.write('\n')
+        json.dump(feature, f, separators=(',', ':'))
+        self.counts[shard] += 1
+
+    @profiler.instrument('shard_write')
+    def add(self, feature):
+        """Write a feature to its shards and index its title and branch"""
+        doc_id = len(self.docs)
+        status = feature.get('status', 'unknown')
+        month = feature['created'][:7] if feature.get('created') else UNDATED_MONTH
+        self._append(f"status-{status}", feature)
+        self._append(f"month-{month}", feature)
+        
+        self.docs.append([
+            feature.get('title', feature.get('branch', 'Unknown')),
+            feature.get('branch', ''),
+            status,
+            month,
+            feature.get('pr')
+        ])
+        tokens = set(tokenize(feature.get('title'))) | set(branch_tokens(feature.get('branch')))
+        for token in tokens:
+            self.index.setdefault(token, []).append(doc_id)
+
+    @profiler.instrument('shard_close')
+    def close(self, generated, repo_name, statistics):
+        """Finish all shards and write the manifest and search index"""
+        for f in self.files.values():
+            f.write('\n]\n')
+            f.close()
+        self.files = {}
+        
+        # Swap the new shards in, dropping removed statuses/months with the old set
+        live_dir = os.path.join(self.output_dir, SHARD_DIR)
+        old_dir = os.path.join(self.output_dir, f".{SHARD_DIR}.old")
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(live_dir):
+            os.replace(live_dir, old_dir)
+        os.replace(self.shard_dir, live_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        
+        shards = {'status': {}, 'month': {}}
+        for shard, count in sorted(self.counts.items()):
+            kind, key = shard.split('-', 1)
+            shards[kind][key] = {
+                'path': f"{SHARD_DIR}/{shard}.json",
+                'count': count
+            }
+        
+        manifest = {
+            'generated': generated,
+            'repository': repo_name,
+            'statistics': statistics,
+            'shards': shards,
+            'search_index': 'search-index.json'
+        }
+        # docs[i] = [title, branch, status, month, pr]; index maps token -> doc ids
+        search_index = {
+            'generated': generated,
+            'fields': ['title', 'branch', 'status', 'month', 'pr'],
+            'docs': self.docs,
+            'index': {token: self.index[token] for token in sorted(self.index)}
+        }
+        self._write_json('search-index.json', search_index, separators=(',', ':'))
+        self._write_json('manifest.json', manifest, indent=2)
+        
+        return manifest
+
+    def _write_json(self, name, data, **kwargs):
+        """Write a JSON file via a temporary file so readers never see it half-written"""
+        path = os.path.join(self.output_dir, name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f, **kwargs)
+        os.replace(path + '.tmp', path)
+
+@profiler.instrument('feature_loop')
+def pr_feature(pr):
+    """Build the dashboard entry for a CrowdCode PR, or None for other PRs"""
+    pr_labels = [label.name for label in pr.labels]
+    
+    if not any(label.startswith('crowdcode:') for label in pr_labels):
+        return None
+    
+    # Determine status
+    if 'crowdcode:promoted' in pr_labels:
+        status = 'promoted'
+    elif 'crowdcode:ready-to-promote' in pr_labels:
+        status = 'ready-to-promote'
+    elif 'crowdcode:voting' in pr_labels or 'crowdcode:ai-generated' in pr_labels:
+        status = 'voting'
+    elif 'crowdcode:pending-pr' in pr_labels:
+        status = 'pending'
+    elif 'crowdcode:archived' in pr_labels:
+        status = 'archived'
+    else:
+        status = 'unknown'
+    
+    return {
+        'branch': pr.head.ref if pr.head else 'unknown',
+        'issue': pr.number,
+        'pr': pr.number,
+        'status': status,
+        'created': pr.created_at.isoformat(),
+        'title': pr.title,
+        'description': pr.title
+    }
 
 def main():
     """Main execution"""
@@ -25,62 +184,45 @@ def main():
     print("-" * 60)
     
     # Initialize GitHub client
-    gh = Github(github_token)
+    gh = github_client(github_token)
     repo = gh.get_repo(repo_name)
     
-    # Collect feature data
+    # Collect feature data, streaming each one into the dashboard shards
+    output_dir = 'docs/features'
+    shard_writer = ShardWriter(output_dir)
     features = []
     
     # Get all feature branches
     branches = repo.get_branches()
-    for branch in branches:
+    for branch in profiler.iterate('pagination', branches):
         if branch.name.startswith('crowdcode/feature-'):
             # Parse branch name
             parts = branch.name.split('-')
             if len(parts) >= 3:
                 try:
                     issue_num = int(parts[2])
-                    features.append({
+                    feature = {
                         'branch': branch.name,
                         'issue': issue_num,
                         'status': 'branch-only'
-                    })
+                    }
+                    features.append(feature)
+                    shard_writer.add(feature)
                 except ValueError:
                     pass
     
     # Get all PRs
     prs = repo.get_pulls(state='all')
-    for pr in prs:
-        pr_labels = [label.name for label in pr.labels]
-        
-        if any(label.startswith('crowdcode:') for label in pr_labels):
-            # Determine status
-            if 'crowdcode:promoted' in pr_labels:
-                status = 'promoted'
-            elif 'crowdcode:ready-to-promote' in pr_labels:
-                status = 'ready-to-promote'
-            elif 'crowdcode:voting' in pr_labels or 'crowdcode:ai-generated' in pr_labels:
-                status = 'voting'
-            elif 'crowdcode:pending-pr' in pr_labels:
-                status = 'pending'
-            elif 'crowdcode:archived' in pr_labels:
-                status = 'archived'
-            else:
-                status = 'unknown'
-            
-            features.append({
-                'branch': pr.head.ref if pr.head else 'unknown',
-                'issue': pr.number,
-                'pr': pr.number,
-                'status': status,
-                'created': pr.created_at.isoformat(),
-                'title': pr.title,
-                'description': pr.title
-            })
+    for pr in profiler.iterate('pagination', prs):
+        feature = pr_feature(pr)
+        if feature:
+            features.append(feature)
+            shard_writer.add(feature)
     
     # Generate dashboard data
+    generated = datetime.utcnow().isoformat()
     dashboard = {
-        'generated': datetime.utcnow().isoformat(),
+        'generated': generated,
         'repository': repo_name,
         'features': features,
         'statistics': {
@@ -92,19 +234,24 @@ def main():
         }
     }
     
+    # Write shard manifest and search index
+    manifest = shard_writer.close(generated, repo_name, dashboard['statistics'])
+    shard_count = len(manifest['shards']['status']) + len(manifest['shards']['month'])
+    
     # Write dashboard JSON
-    os.makedirs('docs/features', exist_ok=True)
-    with open('docs/features/index.json', 'w') as f:
-        json.dump(dashboard, f, indent=2)
+    with profiler.phase('write_index'):
+        with open(os.path.join(output_dir, 'index.json'), 'w') as f:
+            json.dump(dashboard, f, separators=(',', ':'))
     
     print(f"\n✓ Generated dashboard with {len(features)} features")
     print(f"  - Promoted: {dashboard['statistics']['promoted']}")
     print(f"  - Voting: {dashboard['statistics']['voting']}")
     print(f"  - Pending: {dashboard['statistics']['pending']}")
     print(f"  - Archived: {dashboard['statistics']['archived']}")
+    print(f"✓ Wrote {shard_count} shard(s), manifest.json and search-index.json")
     
-    # Generate README
-    readme = f"""# CrowdCode Features
+    # Generate README, streaming one line per feature
+    readme_header = f"""# CrowdCode Features
 
 **Last Updated**: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
 
@@ -119,33 +266,44 @@ def main():
 ## All Features
 
 """
+    status_emojis = {
+        'promoted': '✅',
+        'ready-to-promote': '🎯',
+        'voting': '🗳️',
+        'pending': '⏳',
+        'archived': '📦',
+        'branch-only': '🌿'
+    }
     
-    for feature in sorted(features, key=lambda f: f.get('created', ''), reverse=True):
-        status_emoji = {
-            'promoted': '✅',
-            'ready-to-promote': '🎯',
-            'voting': '🗳️',
-            'pending': '⏳',
-            'archived': '📦',
-            'branch-only': '🌿'
-        }.get(feature.get('status', 'unknown'), '❓')
-        
-        title = feature.get('title', feature.get('branch', 'Unknown'))
-        issue_num = feature.get('issue', '')
-        pr_num = feature.get('pr', '')
-        
-        readme += f"- {status_emoji} **{title}**"
-        if issue_num:
-            readme += f" ([Issue #{issue_num}](../../issues/{issue_num}))"
-        if pr_num:
-            readme += f" ([PR #{pr_num}](../../pull/{pr_num}))"
-        readme += f" - {feature.get('status', 'unknown')}\n"
-    
-    with open('docs/features/README.md', 'w') as f:
-        f.write(readme)
+    with profiler.phase('write_readme'):
+        with open(os.path.join(output_dir, 'README.md'), 'w') as f:
+            f.write(readme_header)
+            for feature in sorted(features, key=lambda f: f.get('created', ''), reverse=True):
+                status_emoji = status_emojis.get(feature.get('status', 'unknown'), '❓')
+                
+                title = feature.get('title', feature.get('branch', 'Unknown'))
+                issue_num = feature.get('issue', '')
+                pr_num = feature.get('pr', '')
+                
+                line = f"- {status_emoji} **{title}**"
+                if issue_num:
+                    line += f" ([Issue #{issue_num}](../../issues/{issue_num}))"
+                if pr_num:
+                    line += f" ([PR #{pr_num}](../../pull/{pr_num}))"
+                f.write(f"{line} - {feature.get('status', 'unknown')}\n")
     
     print("✓ Generated README.md")
     print("\nComplete!")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Generate the CrowdCode feature dashboard')
+    add_profile_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+    start_cassette(args)
+    try:
+        main()
+    finally:
+        cassette.finish()
+        profiler.finish('generate-dashboard')
@@ -9,11 +9,14 @@ AI-powered pull requests for each one.
 import os
 import sys
 import json
+import argparse
 import re
 import yaml
-from github import Github
 from datetime import datetime
+from crowdcode_profiling import profiler, add_profile_arguments, start_profiling
+from crowdcode_cassette import cassette, add_cassette_arguments, start_cassette, github_client
 
+@profiler.instrument('load_config')
 def load_config():
     """Load CrowdCode configuration"""
     config_path = '.github/crowdcode-config.yml'
@@ -46,6 +49,7 @@ def slugify(text):
     text = re.sub(r'^-+|-+$', '', text)
     return text[:50]  # Limit length
 
+@profiler.instrument('parse_issue_body')
 def parse_issue_body(body):
     """Parse structured issue body from GitHub issue template"""
     # Simple parser for form responses
@@ -66,6 +70,7 @@ def parse_issue_body(body):
     
     return sections
 
+@profiler.instrument('generate_pr_description')
 def generate_pr_description(issue):
     """Generate PR description from issue"""
     sections = parse_issue_body(issue.body)
@@ -146,7 +151,7 @@ def main():
     base_branch = config['branches']['base_branch']
     
     # Initialize GitHub client
-    gh = Github(github_token)
+    gh = github_client(github_token)
     repo = gh.get_repo(repo_name)
     
     # Find feature request issues without PR
@@ -157,7 +162,7 @@ def main():
     )
     
     processed = 0
-    for issue in issues:
+    for issue in profiler.iterate('pagination', issues):
         if processed >= max_per_run:
             print(f"\nReached maximum of {max_per_run} issues per run")
             break
@@ -183,14 +188,16 @@ def main():
             try:
                 # For now, just add labels to indicate PR would be created
                 # Full implementation with branch creation and PR will come in Phase 2
-                issue.add_to_labels(labels['pending_pr'])
-                issue.create_comment(
-                    f"🤖 CrowdCode PR generation initiated!\n\n"
-                    f"A pull request will be created with AI-generated code.\n"
-                    f"Branch: `{branch_name}`\n\n"
-                    f"**Note**: Full AI code generation is coming in Phase 2. "
-                    f"For now, this demonstrates the CrowdCode workflow structure."
-                )
+                with profiler.phase('write_labels'):
+                    issue.add_to_labels(labels['pending_pr'])
+                with profiler.phase('write_comment'):
+                    issue.create_comment(
+                        f"🤖 CrowdCode PR generation initiated!\n\n"
+                        f"A pull request will be created with AI-generated code.\n"
+                        f"Branch: `{branch_name}`\n\n"
+                        f"**Note**: Full AI code generation is coming in Phase 2. "
+                        f"For now, this demonstrates the CrowdCode workflow structure."
+                    )
                 print(f"  ✓ Added '{labels['pending_pr']}' label")
                 print(f"  ✓ Posted comment on issue")
             except Exception as e:
@@ -208,4 +215,14 @@ def main():
     print("Complete!")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Generate CrowdCode PRs from feature request issues')
+    add_profile_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+    start_cassette(args)
+    try:
+        main()
+    finally:
+        cassette.finish()
+        profiler.finish('generate-feature-pr')
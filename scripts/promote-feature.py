@@ -9,10 +9,13 @@ PatchPanel votes meeting the promotion threshold.
 import os
 import sys
 import json
+import argparse
 import yaml
-from github import Github
 from datetime import datetime
+from crowdcode_profiling import profiler, add_profile_arguments, start_profiling
+from crowdcode_cassette import cassette, add_cassette_arguments, start_cassette, github_client
 
+@profiler.instrument('load_config')
 def load_config():
     """Load CrowdCode configuration"""
     config_path = '.github/crowdcode-config.yml'
@@ -28,9 +31,25 @@ def load_config():
                 'require_codeql': False,
                 'auto_delete_branch': False,
                 'notify_members': True
+            },
+            'dashboard': {
+                'path': 'docs/features',
+                'generate_changelog': True
             }
         }
 
+def record_promotion(events_path, pr):
+    """Append a promotion event for the changelog stage to consume"""
+    event = {
+        'pr': pr.number,
+        'title': pr.title,
+        'branch': pr.head.ref if pr.head else None,
+        'promoted_at': datetime.utcnow().isoformat()
+    }
+    os.makedirs(os.path.dirname(events_path), exist_ok=True)
+    with open(events_path, 'a') as f:
+        f.write(json.dumps(event) + '\n')
+
 def main():
     """Main execution"""
     github_token = os.environ.get('GITHUB_TOKEN')
@@ -49,9 +68,11 @@ def main():
     # Load configuration
     config = load_config()
     merge_method = config['promotion'].get('merge_method', 'squash')
+    dashboard_config = config.get('dashboard', {})
+    events_path = os.path.join(dashboard_config.get('path', 'docs/features'), 'promotions.jsonl')
     
     # Initialize GitHub client
-    gh = Github(github_token)
+    gh = github_client(github_token)
     repo = gh.get_repo(repo_name)
     
     # Find PRs ready to promote
@@ -59,7 +80,7 @@ def main():
     prs = repo.get_pulls(state='open')
     
     promoted = 0
-    for pr in prs:
+    for pr in profiler.iterate('pagination', prs):
         pr_labels = [label.name for label in pr.labels]
         
         if 'crowdcode:ready-to-promote' not in pr_labels:
@@ -68,7 +89,9 @@ def main():
         print(f"\nProcessing PR #{pr.number}: {pr.title}")
         
         # Check if PR is mergeable
-        if not pr.mergeable:
+        with profiler.phase('mergeable_check'):
+            mergeable = pr.mergeable
+        if not mergeable:
             print(f"  ⚠️  PR has merge conflicts, skipping")
             continue
         
@@ -85,16 +108,24 @@ def main():
             try:
                 # For now, just update labels to show it would be promoted
                 # Full merge implementation will come once we have actual PRs with code
-                pr.remove_from_labels('crowdcode:ready-to-promote')
-                pr.add_to_labels('crowdcode:promoted')
+                with profiler.phase('write_labels'):
+                    pr.remove_from_labels('crowdcode:ready-to-promote')
+                    pr.add_to_labels('crowdcode:promoted')
+                
+                # Record the event as soon as the PR is marked promoted; a later
+                # failure would otherwise drop it from the changelog for good
+                if dashboard_config.get('generate_changelog', False):
+                    record_promotion(events_path, pr)
+                    print(f"  ✓ Recorded promotion event for changelog")
                 
                 # Add comment
-                pr.create_comment(
-                    f"🎉 **Feature Promoted!**\n\n"
-                    f"This feature has been approved by the PatchPanel and is ready for merge.\n\n"
-                    f"**Note**: Actual merge to main will be implemented in Phase 2 once we have "
-                    f"AI-generated code to merge. For now, this demonstrates the promotion workflow."
-                )
+                with profiler.phase('write_comment'):
+                    pr.create_comment(
+                        f"🎉 **Feature Promoted!**\n\n"
+                        f"This feature has been approved by the PatchPanel and is ready for merge.\n\n"
+                        f"**Note**: Actual merge to main will be implemented in Phase 2 once we have "
+                        f"AI-generated code to merge. For now, this demonstrates the promotion workflow."
+                    )
                 
                 # Close linked issue
                 # Parse issue number from PR body
@@ -102,14 +133,16 @@ def main():
                     issue_num_str = pr.body.split("**Related Issue**: #")[1].split()[0]
                     try:
                         issue_num = int(issue_num_str)
-                        issue = repo.get_issue(issue_num)
-                        issue.create_comment(
-                            f"✅ **Feature Promoted!**\n\n"
-                            f"This feature request has been approved and promoted via PR #{pr.number}.\n\n"
-                            f"Thank you for your contribution to the project!"
-                        )
-                        issue.add_to_labels('crowdcode:promoted')
-                        issue.edit(state='closed')
+                        with profiler.phase('fetch_issue'):
+                            issue = repo.get_issue(issue_num)
+                        with profiler.phase('write_issue'):
+                            issue.create_comment(
+                                f"✅ **Feature Promoted!**\n\n"
+                                f"This feature request has been approved and promoted via PR #{pr.number}.\n\n"
+                                f"Thank you for your contribution to the project!"
+                            )
+                            issue.add_to_labels('crowdcode:promoted')
+                            issue.edit(state='closed')
                         print(f"  ✓ Closed issue #{issue_num}")
                     except (ValueError, IndexError) as e:
                         print(f"  ⚠️  Could not parse issue number: {e}")
@@ -131,4 +164,14 @@ def main():
     print("Complete!")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Promote approved CrowdCode features')
+    add_profile_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+    start_cassette(args)
+    try:
+        main()
+    finally:
+        cassette.finish()
+        profiler.finish('promote-feature')
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+CrowdCode: Update Changelog from Promotion Events
+
+This script appends newly promoted features to the changelog. It reads the
+promotion events written by promote-feature.py and keeps a watermark of the
+last event it recorded, so each run only processes new promotions.
+"""
+
+import os
+import json
+import argparse
+import yaml
+from datetime import datetime
+from crowdcode_profiling import profiler, add_profile_arguments, start_profiling
+
+CHANGELOG_HEADER = """# CrowdCode Changelog
+
+Features promoted by the PatchPanel, grouped by release period.
+"""
+
+@profiler.instrument('load_config')
+def load_config():
+    """Load CrowdCode configuration"""
+    config_path = '.github/crowdcode-config.yml'
+    try:
+        with open(config_path, 'r') as f:
+            return yaml.safe_load(f)
+    except FileNotFoundError:
+        print(f"Warning: Config file {config_path} not found, using defaults")
+        return {
+            'dashboard': {
+                'path': 'docs/features',
+                'generate_changelog': True
+            }
+        }
+
+def load_state(state_path):
+    """Load the changelog watermark"""
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'offset': 0, 'last_pr': None, 'last_period': None}
+
+def write_state(state_path, state):
+    """Write the watermark via a temporary file so it is never half-written"""
+    with open(state_path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(state_path + '.tmp', state_path)
+
+@profiler.instrument('read_new_events')
+def read_new_events(events_path, offset):
+    """Read promotion events written after the given byte offset"""
+    events = []
+    with open(events_path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            # Stop at a partially written trailing line; it is picked up next run
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events, offset
+
+def release_period(event):
+    """Release period (YYYY-MM) an event belongs to"""
+    return event.get('promoted_at', '')[:7] or 'unreleased'
+
+def format_entry(event):
+    """Format a single changelog line"""
+    entry = f"- {event.get('title', 'Untitled feature')} ([PR #{event['pr']}](../../pull/{event['pr']}))"
+    if event.get('branch'):
+        entry += f" - `{event['branch']}`"
+    return entry + "\n"
+
+def main():
+    """Main execution"""
+    rebuild = os.environ.get('REBUILD_CHANGELOG', 'false').lower() == 'true'
+    
+    print(f"CrowdCode Changelog Update")
+    print(f"Full Rebuild: {rebuild}")
+    print("-" * 60)
+    
+    config = load_config()
+    dashboard_config = config.get('dashboard', {})
+    if not dashboard_config.get('generate_changelog', False):
+        print("\nChangelog generation disabled (dashboard.generate_changelog)")
+        return
+    
+    output_dir = dashboard_config.get('path', 'docs/features')
+    events_path = os.path.join(output_dir, 'promotions.jsonl')
+    state_path = os.path.join(output_dir, 'changelog-state.json')
+    changelog_path = os.path.join(output_dir, 'CHANGELOG.md')
+    
+    if not os.path.exists(events_path):
+        print(f"\nNo promotion events found at {events_path}")
+        return
+    
+    state = load_state(state_path)
+    changelog_size = os.path.getsize(changelog_path) if os.path.exists(changelog_path) else None
+    recorded_size = state.get('changelog_size')
+    if (changelog_size is None or os.path.getsize(events_path) < state['offset']
+            or (recorded_size is not None and changelog_size < recorded_size)):
+        # Changelog missing, shortened or event log rewritten: the watermark is meaningless
+        if not rebuild:
+            print("\nWatermark does not match event log, rebuilding")
+        rebuild = True
+    elif recorded_size is not None and changelog_size > recorded_size and not rebuild:
+        # A previous run appended entries but failed before saving the watermark
+        print("\nDiscarding entries appended after the last saved watermark")
+        with open(changelog_path, 'r+b') as f:
+            f.truncate(recorded_size)
+    
+    if rebuild:
+        state = {'offset': 0, 'last_pr': None, 'last_period': None}
+    
+    events, offset = read_new_events(events_path, state['offset'])
+    print(f"\nNew promotion events: {len(events)}")
+    
+    if not events and not rebuild:
+        print("Changelog is up to date")
+        return
+    
+    with profiler.phase('write'):
+        with open(changelog_path, 'w' if rebuild else 'a') as f:
+            if rebuild:
+                f.write(CHANGELOG_HEADER)
+            for event in events:
+                period = release_period(event)
+                if period != state['last_period']:
+                    f.write(f"\n## {period}\n\n")
+                    state['last_period'] = period
+                f.write(format_entry(event))
+                state['last_pr'] = event['pr']
+    
+    state['offset'] = offset
+    state['changelog_size'] = os.path.getsize(changelog_path)
+    state['updated'] = datetime.utcnow().isoformat()
+    write_state(state_path, state)
+    
+    print(f"✓ {'Rebuilt' if rebuild else 'Appended to'} {changelog_path}")
+    print(f"  Last recorded PR: #{state['last_pr']}" if state['last_pr'] else "  No promotions recorded")
+    print("\nComplete!")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Append promoted CrowdCode features to the changelog')
+    add_profile_arguments(parser)
+    start_profiling(parser.parse_args())
+    try:
+        main()
+    finally:
+        profiler.finish('update-changelog')
@@ -7,12 +7,23 @@ on AI-generated pull requests.
 """
 
 import os
+import re
 import sys
+import argparse
 import json
+import time
+import hashlib
 import yaml
-from github import Github
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from crowdcode_profiling import profiler, add_profile_arguments, start_profiling
+from crowdcode_cassette import cassette, add_cassette_arguments, start_cassette, github_client
 
+VOTE_SUMMARY_HEADER = "## 🗳️ PatchPanel Vote Status"
+VOTE_BASIS_MARKER = "<!-- crowdcode-vote-basis: {} -->"
+VOTE_BASIS_PATTERN = re.compile(r"<!-- crowdcode-vote-basis: (\S+) -->")
+IGNORED_TRIGGER = 'ignored'
+
+@profiler.instrument('load_config')
 def load_config():
     """Load CrowdCode configuration"""
     config_path = '.github/crowdcode-config.yml'
@@ -25,6 +36,7 @@ def load_config():
             'voting': {
                 'quorum': 3,
                 'approval_threshold': 0.5,
+                'debounce_seconds': 60,
                 'count_reactions': True,
                 'count_reviews': True,
                 'valid_reactions': {
@@ -46,6 +58,96 @@ def load_patchpanel_members():
         print(f"Warning: {members_path} not found, no authorized voters")
         return []
 
+def parse_timestamp(value):
+    """Parse a GitHub ISO 8601 timestamp into an aware datetime"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def load_trigger_event():
+    """Return (pr_number, event_time) for a review/comment trigger, else None
+
+    Scheduled and manual runs have no trigger and recount every voting PR.
+    Comments on plain issues return IGNORED_TRIGGER, since they cannot
+    change any vote.
+    """
+    event_name = os.environ.get('GITHUB_EVENT_NAME', '')
+    event_path = os.environ.get('GITHUB_EVENT_PATH')
+    if event_name not in ('pull_request_review', 'issue_comment') or not event_path:
+        return None
+    
+    with open(event_path, 'r') as f:
+        event = json.load(f)
+    
+    if event_name == 'pull_request_review':
+        pull_request = event['pull_request']
+        # Edits and dismissals keep the review's original submitted_at, which
+        # can be days old; the PR's updated_at reflects when they happened
+        if event.get('action') == 'submitted' and event['review'].get('submitted_at'):
+            return pull_request['number'], parse_timestamp(event['review']['submitted_at'])
+        if pull_request.get('updated_at'):
+            return pull_request['number'], parse_timestamp(pull_request['updated_at'])
+        return pull_request['number'], datetime.now(timezone.utc)
+    
+    # issue_comment also fires for plain issues; only PR comments affect votes
+    if 'pull_request' not in event['issue']:
+        return IGNORED_TRIGGER
+    return event['issue']['number'], parse_timestamp(event['comment']['created_at'])
+
+def coalesce_events(repo, pr, event_time, window, wait=True):
+    """Debounce a burst of review/comment events on one PR
+
+    Waits out the debounce window, then looks at the PR's review and comment
+    activity. If a newer event arrived, its run will do the recount and this
+    one should stop. Returns (should_recount, coalesced_event_count).
+
+    wait=False skips the sleep but keeps the window, e.g. for cassette replays.
+    """
+    if wait and window > 0:
+        print(f"  Waiting {window}s for more events on PR #{pr.number}...")
+        # Timed apart from the API calls so it does not mask them in profiles
+        with profiler.phase('debounce_wait'):
+            time.sleep(window)
+    
+    burst_start = event_time - timedelta(seconds=window)
+    with profiler.phase('coalesce_fetch'):
+        timestamps = [review.submitted_at for review in pr.get_reviews() if review.submitted_at]
+        timestamps += [comment.created_at for comment in repo.get_issue(pr.number).get_comments(since=burst_start)]
+    
+    if any(ts > event_time for ts in timestamps):
+        return False, 0
+    
+    return True, max(1, len([ts for ts in timestamps if ts >= burst_start]))
+
+def body_hash(body):
+    """Hash a PR body to detect concurrent edits"""
+    return hashlib.sha256((body or "").encode('utf-8')).hexdigest()
+
+def read_vote_basis(body):
+    """Return the PR updated_at the current vote summary was computed from"""
+    match = VOTE_BASIS_PATTERN.search(body or "")
+    return parse_timestamp(match.group(1)) if match else None
+
+@profiler.instrument('merge_vote_summary')
+def merge_vote_summary(body, summary):
+    """Insert or replace the vote summary section of a PR body"""
+    body = body or ""
+    if VOTE_SUMMARY_HEADER in body:
+        # Replace existing summary
+        parts = body.split(VOTE_SUMMARY_HEADER)
+        # Find the end of the vote summary (next ## or end of string)
+        summary_end = parts[1].find("\n## ")
+        if summary_end == -1:
+            summary_end = parts[1].find("\n---\n**Related Issue**")
+        if summary_end != -1:
+            return parts[0] + summary + parts[1][summary_end:]
+        return parts[0] + summary
+    
+    # Add summary before related issue footer
+    if "**Related Issue**" in body:
+        parts = body.split("---\n**Related Issue**")
+        return parts[0] + summary + "\n\n---\n**Related Issue**" + parts[1]
+    return body + "\n\n" + summary
+
+@profiler.instrument('count_votes')
 def count_votes(pr, members, config):
     """Count votes from PatchPanel members on a PR"""
     votes = {
@@ -131,12 +233,17 @@ def check_promotion_criteria(votes, config):
     
     return True, f"Ready to promote ({approval_rate:.1%} approval, {total_votes} votes)"
 
-def generate_vote_summary(votes, ready, reason):
-    """Generate markdown summary of votes"""
+@profiler.instrument('generate_vote_summary')
+def generate_vote_summary(votes, ready, reason, basis=None):
+    """Generate markdown summary of votes
+
+    basis is the PR updated_at the votes were counted from; it is embedded as
+    a hidden marker so a stale run never overwrites a newer summary.
+    """
     decisive_votes = votes['approve'] + votes['reject']
     approval_pct = votes['approve'] / decisive_votes * 100 if decisive_votes > 0 else 0
     
-    summary = f"""## 🗳️ PatchPanel Vote Status
+    summary = f"""{VOTE_SUMMARY_HEADER}
 
 **Vote Count**: {votes['approve']} approve, {votes['reject']} reject, {votes['review']} review ({votes['total']} total)
 **Approval Rate**: {approval_pct:.1f}% ({votes['approve']}/{decisive_votes} decisive votes)
@@ -161,9 +268,18 @@ def generate_vote_summary(votes, ready, reason):
             summary += f"- @{voter}\n"
     
     summary += f"\n---\n*Updated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC*"
+    if basis:
+        summary += "\n" + VOTE_BASIS_MARKER.format(basis.isoformat())
     
     return summary
 
+def set_output(name, value):
+    """Expose a value as a GitHub Actions step output when available"""
+    output_path = os.environ.get('GITHUB_OUTPUT')
+    if output_path:
+        with open(output_path, 'a') as f:
+            f.write(f"{name}={value}\n")
+
 def main():
     """Main execution"""
     github_token = os.environ.get('GITHUB_TOKEN')
@@ -191,16 +307,41 @@ def main():
         print("\nWarning: No PatchPanel members configured!")
         print("Add members to .github/PATCHPANEL_MEMBERS.json")
     
+    trigger = load_trigger_event()
+    if trigger == IGNORED_TRIGGER:
+        print(f"\nComment is not on a pull request, nothing to recount")
+        set_output('coalesced', 0)
+        print("Complete!")
+        return
+    
     # Initialize GitHub client
-    gh = Github(github_token)
+    gh = github_client(github_token)
     repo = gh.get_repo(repo_name)
     
-    # Find PRs with voting label
-    print(f"\nSearching for PRs with label 'crowdcode:voting'...")
-    prs = repo.get_pulls(state='open')
+    # Event-triggered runs recount only the PR that changed, once per burst
+    coalesced = 0
+    if trigger:
+        pr_number, event_time = trigger
+        debounce = config['voting'].get('debounce_seconds', 60)
+        print(f"\nTriggered by {os.environ.get('GITHUB_EVENT_NAME')} on PR #{pr_number}")
+        pr = repo.get_pull(pr_number)
+        # A replayed run already holds the activity seen after the recorded wait
+        should_recount, coalesced = coalesce_events(repo, pr, event_time, debounce,
+                                                    wait=cassette.mode != 'replay')
+        if not should_recount:
+            print(f"  Newer event on PR #{pr_number}, deferring recount to its run")
+            set_output('coalesced', 0)
+            print("Complete!")
+            return
+        print(f"  Coalesced {coalesced} event(s) into a single recount")
+        prs = [pr]
+    else:
+        # Find PRs with voting label
+        print(f"\nSearching for PRs with label 'crowdcode:voting'...")
+        prs = repo.get_pulls(state='open')
     
     processed = 0
-    for pr in prs:
+    for pr in profiler.iterate('pagination', prs):
         pr_labels = [label.name for label in pr.labels]
         
         if 'crowdcode:voting' not in pr_labels and 'crowdcode:ai-generated' not in pr_labels:
@@ -208,6 +349,10 @@ def main():
         
         print(f"\nProcessing PR #{pr.number}: {pr.title}")
         
+        # Snapshot the PR state the recount is based on
+        basis = pr.updated_at
+        snapshot_hash = body_hash(pr.body)
+        
         # Count votes
         votes = count_votes(pr, members, config)
         print(f"  Votes: {votes['approve']} approve, {votes['reject']} reject, {votes['review']} review")
@@ -217,38 +362,32 @@ def main():
         print(f"  Status: {reason}")
         
         # Generate summary
-        summary = generate_vote_summary(votes, ready, reason)
+        summary = generate_vote_summary(votes, ready, reason, basis)
         
         if not dry_run:
             try:
-                # Update PR body with vote summary
-                # Find existing vote summary and replace it
-                body = pr.body or ""
-                if "## 🗳️ PatchPanel Vote Status" in body:
-                    # Replace existing summary
-                    parts = body.split("## 🗳️ PatchPanel Vote Status")
-                    # Find the end of the vote summary (next ## or end of string)
-                    summary_end = parts[1].find("\n## ")
-                    if summary_end == -1:
-                        summary_end = parts[1].find("\n---\n**Related Issue**")
-                    if summary_end != -1:
-                        new_body = parts[0] + summary + parts[1][summary_end:]
-                    else:
-                        new_body = parts[0] + summary
-                else:
-                    # Add summary before related issue footer
-                    if "**Related Issue**" in body:
-                        parts = body.split("---\n**Related Issue**")
-                        new_body = parts[0] + summary + "\n\n---\n**Related Issue**" + parts[1]
-                    else:
-                        new_body = body + "\n\n" + summary
+                # Last-writer guard: re-read the PR and never overwrite a
+                # summary computed from a newer PR state
+                with profiler.phase('fetch_current'):
+                    current = repo.get_pull(pr.number)
+                current_basis = read_vote_basis(current.body)
+                if current_basis and basis and current_basis > basis:
+                    print(f"  ⚠️  Newer vote summary already present, skipping stale update")
+                    processed += 1
+                    continue
+                if body_hash(current.body) != snapshot_hash:
+                    print(f"  PR body changed during recount, merging into latest body")
                 
-                pr.edit(body=new_body)
+                # Update PR body with vote summary
+                new_body = merge_vote_summary(current.body, summary)
+                with profiler.phase('write_body'):
+                    current.edit(body=new_body)
                 
                 # Update labels
-                current_labels = [label.name for label in pr.labels]
+                current_labels = [label.name for label in current.labels]
                 if ready and 'crowdcode:ready-to-promote' not in current_labels:
-                    pr.add_to_labels('crowdcode:ready-to-promote')
+                    with profiler.phase('write_labels'):
+                        current.add_to_labels('crowdcode:ready-to-promote')
                     print(f"  ✓ Added 'crowdcode:ready-to-promote' label")
                 
                 print(f"  ✓ Updated PR description with vote summary")
@@ -263,7 +402,20 @@ def main():
     
     print(f"\n{'=' * 60}")
     print(f"Processed {processed} PR(s)")
+    if coalesced:
+        print(f"Coalesced {coalesced} event(s)")
+    set_output('coalesced', coalesced)
     print("Complete!")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Count PatchPanel votes on CrowdCode PRs')
+    add_profile_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+    start_cassette(args)
+    try:
+        main()
+    finally:
+        cassette.finish()
+        profiler.finish('validate-votes')